@@ -2,6 +2,7 @@
 Command to add mods to the Project Zomboid server
 """
 import os
+import sys
 from pzModManager.commands.base_commands import BaseCommand
 from pzModManager.config_handler import ConfigHandler
 from pzModManager.mod_manager import ModManager
@@ -10,11 +11,11 @@ class AddModsCommand(BaseCommand):
     """Command implementation for adding mods"""
     
     @classmethod
-    def register_subparser(cls, subparsers):
+    def register_subparser(cls, subparsers, help_text):
         """Register the add command subparser"""
         parser = subparsers.add_parser(
             "add", 
-            help="Add mods to the Project Zomboid server"
+            help=help_text
         )
         
         parser.add_argument(
@@ -51,36 +52,59 @@ class AddModsCommand(BaseCommand):
         config_handler = ConfigHandler(server_dir)
         mod_manager = ModManager(server_dir)
         
-        # Create backup if requested
-        if create_backup:
-            import shutil
-            import time
-            
-            backup_file = f"{config_handler.server_ini}.{int(time.time())}.bak"
-            try:
-                shutil.copy2(config_handler.server_ini, backup_file)
-                print(f"Created backup: {backup_file}")
-            except Exception as e:
-                print(f"Warning: Failed to create backup: {e}")
-        
         # Process each mod ID
         mod_map = {}
+        needs_workshop_id = []
         for mod_id_input in mod_ids:
             mod_id, workshop_id = mod_manager.resolve_mod_id(mod_id_input)
             
+            if mod_id and workshop_id is None:
+                # Custom mod ID, ask for all of these together afterwards
+                needs_workshop_id.append(mod_id)
+                continue
+                
             if not mod_id or not workshop_id:
                 print(f"Warning: Could not resolve mod ID for '{mod_id_input}', skipping")
                 continue
                 
             mod_map[mod_id] = workshop_id
             
+        if needs_workshop_id:
+            mod_map.update(self._prompt_workshop_ids(needs_workshop_id))
+            
         if not mod_map:
             print("No valid mods to add")
             return False
             
+        # Create backup if requested, only now that there is something to write
+        linked_backup = None
+        if create_backup:
+            import time
+            
+            backup_file = f"{config_handler.server_ini}.{int(time.time())}.bak"
+            try:
+                # server.ini is rewritten atomically (new inode), so a hardlink
+                # keeps the old contents without copying them
+                try:
+                    os.link(config_handler.server_ini, backup_file)
+                    linked_backup = backup_file
+                except OSError:
+                    # Cross-device or no hardlink support
+                    import shutil
+                    shutil.copy2(config_handler.server_ini, backup_file)
+                print(f"Created backup: {backup_file}")
+            except Exception as e:
+                print(f"Warning: Failed to create backup: {e}")
+        
         # Add the mods to the config
         success = config_handler.add_mods(mod_map)
         
+        if not success and linked_backup:
+            # server.ini was not replaced, so the hardlink is still the live file
+            # and would change with it - drop it, nothing was modified anyway
+            os.unlink(linked_backup)
+            print(f"Removed backup: {linked_backup}")
+        
         if success:
             print(f"Successfully added {len(mod_map)} mods:")
             for mod_id, workshop_id in mod_map.items():
@@ -88,4 +112,40 @@ class AddModsCommand(BaseCommand):
         else:
             print("Failed to add mods to the config")
             
-        return success
\ No newline at end of file
+        return success
+    
+    def _prompt_workshop_ids(self, mod_ids):
+        """
+        Ask the user for the workshop IDs of custom mod IDs
+        
+        Args:
+            mod_ids (list): Mod IDs without a known workshop ID
+            
+        Returns:
+            dict: Mod IDs mapped to the workshop IDs the user entered
+        """
+        # Don't block on input() when nobody can answer (cron, CI, pipes)
+        if not sys.stdin.isatty():
+            for mod_id in mod_ids:
+                print(f"Warning: No workshop ID known for '{mod_id}' and no terminal to ask on, skipping")
+            return {}
+            
+        print("WARNING: The following mods don't follow workshop-XXXXX format:")
+        for mod_id in mod_ids:
+            print(f"  - {mod_id}")
+        print("Please provide the workshop ID for each mod:")
+        
+        resolved = {}
+        for mod_id in mod_ids:
+            try:
+                workshop_id = input(f"{mod_id}> ").strip()
+            except (EOFError, KeyboardInterrupt):
+                print()
+                break
+                
+            if workshop_id.isdigit():
+                resolved[mod_id] = workshop_id
+            else:
+                print(f"Warning: Could not resolve mod ID for '{mod_id}', skipping")
+                
+        return resolved
\ No newline at end of file
@@ -1,23 +1,19 @@
 """
 Base command class for CLI commands
 """
-from abc import ABC, abstractmethod
-import argparse
 
-class BaseCommand(ABC):
-    """Abstract base class for all CLI commands"""
+class BaseCommand:
+    """Base class for all CLI commands"""
     
     def __init__(self, args):
         """Initialize the command with parsed arguments"""
         self.args = args
     
     @classmethod
-    @abstractmethod
-    def register_subparser(cls, subparsers):
-        """Register this command's subparser"""
-        pass
+    def register_subparser(cls, subparsers, help_text):
+        """Register this command's subparser, with the help text from main.COMMANDS"""
+        raise NotImplementedError
     
-    @abstractmethod
     def execute(self):
         """Execute the command"""
-        pass
\ No newline at end of file
+        raise NotImplementedError
\ No newline at end of file
@@ -1,22 +1,23 @@
 """
 Command to list active mods on the Project Zomboid server
 """
-import os, re
-from tabulate import tabulate
+import os, sys
 from pzModManager.commands.base_commands import BaseCommand
 from pzModManager.config_handler import ConfigHandler
 from pzModManager.mod_manager import ModManager
-from pzModManager.utils.file_utils import read_file
+
+# Column order of the rows produced by ListModsCommand._iter_rows
+HEADERS = ("Mod ID", "Workshop ID", "Type", "Name", "Description")
 
 class ListModsCommand(BaseCommand):
     """Command implementation for listing active mods"""
     
     @classmethod
-    def register_subparser(cls, subparsers):
+    def register_subparser(cls, subparsers, help_text):
         """Register the list command subparser"""
         parser = subparsers.add_parser(
             "list", 
-            help="List active mods on the Project Zomboid server"
+            help=help_text
         )
         
         parser.add_argument(
@@ -48,86 +49,81 @@ class ListModsCommand(BaseCommand):
         config_handler = ConfigHandler(server_dir)
         mod_manager = ModManager(server_dir)
         
-        # Get active mods
-        mods = config_handler.get_active_mods()
+        # Get active mods and configuration problems from a single parse
+        diag = config_handler.diagnostics()
+        mods = diag.mapping
         
         if not mods:
             print("No active mods found.")
             return True
         
-        # Build the output data
-        output_data = []
-        for mod_id, workshop_id in mods.items():
-            mod_info = mod_manager.get_mod_info(workshop_id) or {}
-            
-            # Handle mod ID that's not in workshop-XXXXX format
-            mod_type = "Workshop" if mod_id.startswith("workshop-") else "Custom"
-            
-            output_data.append({
-                "Mod ID": mod_id,
-                "Workshop ID": workshop_id,
-                "Type": mod_type,
-                "Name": mod_info.get("name", mod_id),  # Use mod_id as name if not found
-                "Description": mod_info.get("description", "")
-            })
+        # Rows are produced lazily so csv/json output can stream
+        rows = self._iter_rows(mods, mod_manager)
         
         # Output according to format
         if output_format == "table":
-            headers = ["Mod ID", "Workshop ID", "Type", "Name"]
-            table_data = [[item[h] for h in headers] for item in output_data]
-            print(tabulate(table_data, headers=headers, tablefmt="grid"))
+            from tabulate import tabulate
+            table_data = [row[:4] for row in rows]  # tabulate needs every row up front, no description
+            print(tabulate(table_data, headers=HEADERS[:4], tablefmt="grid"))
+            total = len(table_data)
         elif output_format == "csv":
-            print("Mod ID,Workshop ID,Type,Name,Description")
-            for item in output_data:
-                print(f"{item['Mod ID']},{item['Workshop ID']},{item['Type']},\"{item['Name']}\",\"{item['Description']}\"")
+            import csv
+            writer = csv.writer(sys.stdout, lineterminator="\n")
+            writer.writerow(HEADERS)
+            total = 0
+            for row in rows:
+                writer.writerow(row)
+                total += 1
         elif output_format == "json":
-            import json
-            print(json.dumps(output_data, indent=2))
+            total = self._write_json(rows)
         
-        print(f"\nTotal mods: {len(output_data)}")
+        print(f"\nTotal mods: {total}")
         
-        # Check for mismatches in the configuration
-        mods_match = re.search(r'Mods=(.*?)(\r?\n|$)', read_file(config_handler.server_ini))
-        workshop_match = re.search(r'WorkshopItems=(.*?)(\r?\n|$)', read_file(config_handler.server_ini))
+        # Keep the mod.info data parsed for this listing for the next run
+        mod_manager.flush_cache()
         
-        if mods_match and workshop_match:
-            # Get mod_ids with proper escaping handling
-            mod_line = mods_match.group(1)
-            mod_ids = []
-            current_mod = ""
-            escape_next = False
+        # Report mismatches in the configuration
+        if diag.mismatch:
+            missing_workshop, missing_mods = diag.mismatch
+            print(f"\nWARNING: Mismatch in configuration - {len(diag.mod_ids)} mod IDs but {len(diag.workshop_ids)} workshop IDs")
+            print("This may cause issues with mod loading in Project Zomboid.")
             
-            for char in mod_line:
-                if escape_next:
-                    current_mod += char
-                    escape_next = False
-                elif char == '\\':
-                    escape_next = True
-                elif char == ';':
-                    mod_ids.append(current_mod)
-                    current_mod = ""
-                else:
-                    current_mod += char
+            # Show the problematic entries
+            if missing_workshop:
+                print(f"The following {len(missing_workshop)} mod(s) do not have corresponding workshop IDs:")
+                for mod_id in missing_workshop:
+                    print(f"  - {mod_id}")
+            else:
+                print(f"The following {len(missing_mods)} workshop ID(s) do not have corresponding mods:")
+                for workshop_id in missing_mods:
+                    print(f"  - {workshop_id}")
                     
-            # Don't forget the last mod
-            if current_mod:
-                mod_ids.append(current_mod)
-                
-            workshop_ids = workshop_match.group(1).split(';') if workshop_match.group(1) else []
-            
-            if len(mod_ids) != len(workshop_ids):
-                print(f"\nWARNING: Mismatch in configuration - {len(mod_ids)} mod IDs but {len(workshop_ids)} workshop IDs")
-                print("This may cause issues with mod loading in Project Zomboid.")
-                
-                # Show the problematic entries
-                diff = abs(len(mod_ids) - len(workshop_ids))
-                if len(mod_ids) > len(workshop_ids):
-                    print(f"The following {diff} mod(s) do not have corresponding workshop IDs:")
-                    for i in range(len(workshop_ids), len(mod_ids)):
-                        print(f"  - {mod_ids[i]}")
-                else:
-                    print(f"The following {diff} workshop ID(s) do not have corresponding mods:")
-                    for i in range(len(mod_ids), len(workshop_ids)):
-                        print(f"  - {workshop_ids[i]}")
-                        
         return True
+    
+    def _iter_rows(self, mods, mod_manager):
+        """Yield one output row per active mod as a tuple in HEADERS order"""
+        for mod_id, workshop_id in mods.items():
+            mod_info = mod_manager.get_mod_info(workshop_id) or {}
+            
+            # Handle mod ID that's not in workshop-XXXXX format
+            mod_type = "Workshop" if mod_id.startswith("workshop-") else "Custom"
+            
+            yield (
+                mod_id,
+                workshop_id,
+                mod_type,
+                mod_info.get("name", mod_id),  # Use mod_id as name if not found
+                mod_info.get("description", "")
+            )
+    
+    def _write_json(self, rows):
+        """Write rows as an indented JSON array one element at a time, return the count"""
+        import json
+        count = 0
+        sys.stdout.write("[")
+        for row in rows:
+            sys.stdout.write(",\n  " if count else "\n  ")
+            sys.stdout.write(json.dumps(dict(zip(HEADERS, row)), indent=2).replace("\n", "\n  "))
+            count += 1
+        sys.stdout.write("\n]\n" if count else "]\n")
+        return count
@@ -3,8 +3,67 @@ Configuration file handler for Project Zomboid server
 """
 import os
 import re
+from collections import namedtuple
 from pzModManager.utils.file_utils import read_file, write_file
 
+# Mods= / WorkshopItems= lines of server.ini
+_MODS_RE = re.compile(r'^Mods=([^\r\n]*)', re.MULTILINE)
+_WS_RE = re.compile(r'^WorkshopItems=(.*?)(\r?\n|$)', re.MULTILINE)
+
+# One entry of a ';'-separated list, where '\' escapes the next character
+_MOD_SPLIT_RE = re.compile(r'((?:\\.?|[^;\\])*)(?:;|$)', re.DOTALL)
+_UNESCAPE_RE = re.compile(r'\\(.?)', re.DOTALL)
+
+def split_escaped(line, keep_escapes=False):
+    """
+    Split a ';'-separated Mods= value, honouring backslash escapes
+    
+    Args:
+        line (str): Value of the Mods= line
+        keep_escapes (bool): Keep the escape characters in the returned entries
+        
+    Returns:
+        list: Entries in the order they appear in the line
+    """
+    # The pattern always produces a trailing empty match at end of line
+    entries = _MOD_SPLIT_RE.findall(line)[:-1]
+    if keep_escapes:
+        return entries
+        
+    # A dangling escape at the end of the line is not an entry of its own
+    if entries and entries[-1] == '\\':
+        entries.pop()
+    return [_UNESCAPE_RE.sub(r'\1', entry) for entry in entries]
+
+# Result of ConfigHandler.diagnostics()
+ModDiagnostics = namedtuple("ModDiagnostics", ["mapping", "mod_ids", "workshop_ids", "mismatch"])
+
+def _replace_line(src, key, new_line):
+    """
+    Replace the first line starting with 'key=' without splitting the text into lines
+    
+    Args:
+        src (str): Text to edit
+        key (str): Key of the line to replace
+        new_line (str): Replacement line, without line ending
+        
+    Returns:
+        str: The edited text, or src unchanged if no such line exists
+    """
+    prefix = f"{key}="
+    if src.startswith(prefix):
+        start = 0
+    else:
+        start = src.find(f"\n{prefix}")
+        if start == -1:
+            return src
+        start += 1
+        
+    end = src.find("\n", start)
+    if end == -1:
+        return f"{src[:start]}{new_line}\n"
+    return src[:start] + new_line + src[end:]
+
 class ConfigHandler:
     """Handles reading and modifying Project Zomboid server configuration files"""
     
@@ -18,59 +77,78 @@ class ConfigHandler:
         self.server_dir = server_dir
         self.mods_file = os.path.join(server_dir, "mods", "mods.info")
         self.server_ini = os.path.join(server_dir, "server.ini")
+        self._ini_cache = None
+        self._ini_mtime = 0
         
-    def get_active_mods(self):
+    def read_server_ini(self):
         """
-        Get a list of active mods from the server configuration
+        Read server.ini, reusing the last read while the file is unchanged
         
         Returns:
-            dict: Dictionary with mod IDs as keys and Workshop IDs as values
+            str: Contents of server.ini, or empty string if it doesn't exist
+        """
+        try:
+            mtime = os.stat(self.server_ini).st_mtime_ns
+        except OSError:
+            self._ini_cache = None
+            return ""
+            
+        if self._ini_cache is None or mtime != self._ini_mtime:
+            self._ini_cache = read_file(self.server_ini)
+            self._ini_mtime = mtime
+            
+        return self._ini_cache
+        
+    def diagnostics(self):
+        """
+        Parse the Mods= and WorkshopItems= lines once and check that they line up
+        
+        Returns:
+            ModDiagnostics: mapping (dict of mod ID -> Workshop ID), the parsed
+                mod_ids and workshop_ids lists, and mismatch, which is None or a
+                (mods_without_workshop_id, workshop_ids_without_mod) tuple
         """
         active_mods = {}
         
         # Read server.ini to get Mods= and WorkshopItems= lines
-        server_config = read_file(self.server_ini)
+        server_config = self.read_server_ini()
         
         # Extract mod IDs from Mods= line
-        mods_match = re.search(r'^Mods=(.*)', server_config, re.MULTILINE)
-        workshop_match = re.search(r'WorkshopItems=(.*?)(\r?\n|$)', server_config, re.MULTILINE)
+        mods_match = _MODS_RE.search(server_config)
+        workshop_match = _WS_RE.search(server_config)
         
         if mods_match:
             # Handle escaped characters in mod names properly
-            mod_line = mods_match.group(1)
-            mod_ids = []
-            current_mod = ""
-            escape_next = False
-            
-            for char in mod_line:
-                if escape_next:
-                    current_mod += char
-                    escape_next = False
-                elif char == '\\':
-                    escape_next = True
-                elif char == ';':
-                    mod_ids.append(current_mod)
-                    current_mod = ""
-                else:
-                    current_mod += char
-                    
-            # Don't forget the last mod
-            if current_mod:
-                mod_ids.append(current_mod)
+            mod_ids = split_escaped(mods_match.group(1))
         else:
             mod_ids = []
             
         if workshop_match:
-            workshop_ids = workshop_match.group(1).split(';')
+            workshop_ids = workshop_match.group(1).split(';') if workshop_match.group(1) else []
         else:
             workshop_ids = []
         
         # Create a dictionary mapping mod IDs to workshop IDs
-        for i in range(min(len(mod_ids), len(workshop_ids))):
+        common = min(len(mod_ids), len(workshop_ids))
+        for i in range(common):
             if mod_ids[i] and workshop_ids[i]:
                 active_mods[mod_ids[i]] = workshop_ids[i]
                 
-        return active_mods
+        # Entries past the shorter list have no partner
+        mismatch = None
+        if mods_match and workshop_match and len(mod_ids) != len(workshop_ids):
+            mismatch = (mod_ids[common:], workshop_ids[common:])
+            
+        return ModDiagnostics(active_mods, mod_ids, workshop_ids, mismatch)
+        
+    def get_active_mods(self):
+        """
+        Get a list of active mods from the server configuration
+        
+        Returns:
+            dict: Dictionary with mod IDs as keys and Workshop IDs as values
+        """
+        return self.diagnostics().mapping
     
     def add_mods(self, mod_map):
         """
@@ -86,35 +164,15 @@ class ConfigHandler:
             return False
             
         # Read server.ini
-        server_config = read_file(self.server_ini)
+        server_config = self.read_server_ini()
         
         # Extract current mod IDs and workshop IDs
-        mods_match = re.search(r'Mods=(.*?)(\r?\n|$)', server_config)
-        workshop_match = re.search(r'WorkshopItems=(.*?)(\r?\n|$)', server_config)
+        mods_match = _MODS_RE.search(server_config)
+        workshop_match = _WS_RE.search(server_config)
         
         if mods_match and workshop_match:
-            # Parse the mod line properly handling escaped characters
-            mod_line = mods_match.group(1)
-            current_mods = []
-            current_mod = ""
-            escape_next = False
-            
-            for char in mod_line:
-                if escape_next:
-                    current_mod += char
-                    escape_next = False
-                elif char == '\\':
-                    current_mod += '\\'  # Keep the escape character
-                    escape_next = True
-                elif char == ';':
-                    current_mods.append(current_mod)
-                    current_mod = ""
-                else:
-                    current_mod += char
-                    
-            # Don't forget the last mod
-            if current_mod:
-                current_mods.append(current_mod)
+            # Parse the mod line, keeping escapes so entries are written back unchanged
+            current_mods = split_escaped(mods_match.group(1), keep_escapes=True)
                 
             current_workshop = workshop_match.group(1).split(';') if workshop_match.group(1) else []
             
@@ -122,14 +180,20 @@ class ConfigHandler:
             if len(current_mods) > len(current_workshop):
                 current_workshop.extend([''] * (len(current_mods) - len(current_workshop)))
             
+            # Position of each existing mod (first occurrence wins, like list.index)
+            mod_index = {}
+            for idx, mod_id in enumerate(current_mods):
+                mod_index.setdefault(mod_id, idx)
+
             # Add new mods while maintaining order correlation
             for mod_id, workshop_id in mod_map.items():
-                if mod_id not in current_mods:
+                idx = mod_index.get(mod_id)
+                if idx is None:
+                    mod_index[mod_id] = len(current_mods)
                     current_mods.append(mod_id)
                     current_workshop.append(workshop_id)
                 else:
                     # If mod already exists, update its workshop ID at the correct position
-                    idx = current_mods.index(mod_id)
                     current_workshop[idx] = workshop_id
             
             # Ensure the lists are the same length
@@ -143,18 +207,19 @@ class ConfigHandler:
             new_workshop_line = f"WorkshopItems={';'.join(current_workshop)}"
             
             # Replace the lines in the config
-            server_config = re.sub(r'Mods=.*?(\r?\n|$)', f"{new_mods_line}\n", server_config)
-            server_config = re.sub(r'WorkshopItems=.*?(\r?\n|$)', f"{new_workshop_line}\n", server_config)
+            server_config = _replace_line(server_config, "Mods", new_mods_line)
+            server_config = _replace_line(server_config, "WorkshopItems", new_workshop_line)
             
             # Write the updated config back to the file
+            self._ini_cache = None
             return write_file(self.server_ini, server_config)
         else:
             # If the lines don't exist, add them
-            lines = server_config.splitlines()
             mods_str = ';'.join(mod_map.keys())
             workshop_str = ';'.join(mod_map.values())
             
-            lines.append(f"Mods={mods_str}")
-            lines.append(f"WorkshopItems={workshop_str}")
+            existing = server_config.rstrip('\r\n')
+            new_content = (existing + "\n" if existing else "") + f"Mods={mods_str}\nWorkshopItems={workshop_str}\n"
             
-            return write_file(self.server_ini, '\n'.join(lines))
+            self._ini_cache = None
+            return write_file(self.server_ini, new_content)
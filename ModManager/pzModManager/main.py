@@ -3,33 +3,53 @@
 Project Zomboid Server Mod Manager CLI
 """
 import argparse
+import importlib
 import sys
-from pzModManager.commands.list_mods import ListModsCommand
-from pzModManager.commands.add_mods import AddModsCommand
+
+# Command name -> ("module:Class", help). Modules are only imported when their
+# command is actually invoked, so one command never pays for another's imports.
+COMMANDS = {
+    "list": ("pzModManager.commands.list_mods:ListModsCommand",
+             "List active mods on the Project Zomboid server"),
+    "add": ("pzModManager.commands.add_mods:AddModsCommand",
+            "Add mods to the Project Zomboid server"),
+}
+
+def load_command(name):
+    """Import and return the command class registered under name"""
+    module_name, class_name = COMMANDS[name][0].split(":")
+    return getattr(importlib.import_module(module_name), class_name)
 
 def main():
     """Main entry point for the CLI application"""
+    # Pre-parse just the subcommand name so we know which module to load
+    pre_parser = argparse.ArgumentParser(add_help=False)
+    pre_parser.add_argument("command", nargs="?")
+    pre_args, _ = pre_parser.parse_known_args()
+
     parser = argparse.ArgumentParser(description="Project Zomboid Server Mod Manager")
     subparsers = parser.add_subparsers(dest="command", help="Command to execute")
 
     # Register commands
-    ListModsCommand.register_subparser(subparsers)
-    AddModsCommand.register_subparser(subparsers)
+    command_cls = None
+    if pre_args.command in COMMANDS:
+        command_cls = load_command(pre_args.command)
+        command_cls.register_subparser(subparsers, COMMANDS[pre_args.command][1])
+    else:
+        # No (valid) command given - only the names and help are needed for help/errors
+        for name, (_, help_text) in COMMANDS.items():
+            subparsers.add_parser(name, help=help_text)
 
     # Parse arguments
     args = parser.parse_args()
-    
+
     if not args.command:
         parser.print_help()
         sys.exit(1)
-    
+
     # Execute the command
-    if args.command == "list":
-        cmd = ListModsCommand(args)
-        cmd.execute()
-    elif args.command == "add":
-        cmd = AddModsCommand(args)
-        cmd.execute()
+    cmd = command_cls(args)
+    cmd.execute()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -4,21 +4,69 @@ Mod management functionality
 import os
 import re
 import json
-import requests
-from pzModManager.utils.file_utils import read_file
+from pzModManager.utils.file_utils import read_file, write_file
+
+# Parsed mod.info files are kept here between runs
+CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "pzModManager", "workshop.json")
+
+# Fields of a mod's mod.info file
+_MOD_INFO_RE = re.compile(r'^(name|description)=([^\r\n]*)', re.MULTILINE)
 
 class ModManager:
     """Handles operations related to Project Zomboid mods"""
     
-    def __init__(self, server_dir):
+    def __init__(self, server_dir, cache_file=CACHE_FILE):
         """
         Initialize with the server directory path
         
         Args:
             server_dir (str): Path to the Project Zomboid server directory
+            cache_file (str): JSON file used to persist parsed mod.info data
         """
         self.server_dir = server_dir
         self.workshop_cache = {}
+        self.workshop_dir = os.path.join(server_dir, "steamapps", "workshop", "content", "108600")
+        self._workshop_ids = None
+        self.cache_file = cache_file
+        self._file_cache = self._load_cache()
+        self._cache_dirty = False  # Callers persist changes with flush_cache()
+        
+    def _load_cache(self):
+        """Load the persisted mod.info cache, keyed by mod.info path"""
+        content = read_file(self.cache_file)
+        if not content:
+            return {}
+            
+        try:
+            cache = json.loads(content)
+        except ValueError:
+            return {}
+        return cache if isinstance(cache, dict) else {}
+        
+    def _known_workshop_ids(self):
+        """Return the set of installed workshop IDs, listing the content directory once"""
+        if self._workshop_ids is None:
+            try:
+                with os.scandir(self.workshop_dir) as entries:
+                    self._workshop_ids = {entry.name for entry in entries if entry.is_dir()}
+            except OSError:
+                self._workshop_ids = set()
+        return self._workshop_ids
+        
+    def flush_cache(self):
+        """
+        Write the mod.info cache to disk if it changed
+        
+        Returns:
+            bool: True if successful or nothing to write, False otherwise
+        """
+        if not self._cache_dirty:
+            return True
+            
+        if write_file(self.cache_file, json.dumps(self._file_cache)):
+            self._cache_dirty = False
+            return True
+        return False
         
     def get_mod_info(self, workshop_id):
         """
@@ -38,26 +86,38 @@ class ModManager:
         # For now, we'll try to get info from local files
         
         # Check if mod is installed locally
-        local_mod_dir = os.path.join(self.server_dir, "steamapps", "workshop", "content", "108600", workshop_id)
-        if os.path.exists(local_mod_dir):
+        if workshop_id in self._known_workshop_ids():
+            local_mod_dir = os.path.join(self.workshop_dir, workshop_id)
             # Try to find mod.info or similar files
             mod_info_path = os.path.join(local_mod_dir, "mod.info")
-            if os.path.exists(mod_info_path):
-                content = read_file(mod_info_path)
-                #name_match = re.search(r'name=(.*?)(\r?\n|$)', content)
-                name_match = re.search(r'name=([^\r\n]*)', content)
-                desc_match = re.search(r'description=(.*?)(\r?\n|$)', content)
+            try:
+                mtime = os.stat(mod_info_path).st_mtime_ns
+            except OSError:
+                return None
+                
+            # Reuse the result from a previous run if mod.info hasn't changed
+            cache_key = os.path.abspath(mod_info_path)
+            cached = self._file_cache.get(cache_key)
+            if isinstance(cached, dict) and cached.get("mtime") == mtime and isinstance(cached.get("info"), dict):
+                mod_info = cached["info"]
+            else:
+                # Collect both fields in one scan; the first occurrence of each wins
+                fields = {}
+                for key, value in _MOD_INFO_RE.findall(read_file(mod_info_path)):
+                    fields.setdefault(key, value)
                 
                 mod_info = {
                     "id": workshop_id,
-                    "name": name_match.group(1) if name_match else "Unknown",
-                    "description": desc_match.group(1) if desc_match else "",
+                    "name": fields.get("name", "Unknown"),
+                    "description": fields.get("description", ""),
                     "local": True
                 }
+                self._file_cache[cache_key] = {"mtime": mtime, "info": mod_info}
+                self._cache_dirty = True
                 
-                # Cache the result
-                self.workshop_cache[workshop_id] = mod_info
-                return mod_info
+            # Cache the result
+            self.workshop_cache[workshop_id] = mod_info
+            return mod_info
                 
         return None
     
@@ -69,8 +129,12 @@ class ModManager:
             mod_id_or_name (str): Mod ID, Workshop ID, or mod name
             
         Returns:
-            tuple: (mod_id, workshop_id) or (None, None) if not found
+            tuple: (mod_id, workshop_id), (mod_id, None) if the workshop ID
+                has to be supplied by the user, or (None, None) if not found
         """
+        if not mod_id_or_name:
+            return (None, None)
+            
         # Check if it's a direct Steam Workshop ID (numeric)
         if mod_id_or_name.isdigit():
             # We have a Workshop ID, but need to find the corresponding mod ID
@@ -84,16 +148,6 @@ class ModManager:
             workshop_id = mod_id_or_name.split("-")[1]
             return (mod_id_or_name, workshop_id)
             
-        # If it's a custom mod ID (like in the sample file), we need to generate 
-        # a Workshop ID for it or ask the user for one
-        print(f"WARNING: Mod '{mod_id_or_name}' doesn't follow workshop-XXXXX format.")
-        print("Please provide the workshop ID for this mod:")
-        try:
-            workshop_id = input("> ")
-            if workshop_id.isdigit():
-                return (mod_id_or_name, workshop_id)
-        except:
-            pass
-            
-        # If we can't resolve it, return None
-        return (None, None)
+        # It's a custom mod ID (like in the sample file); the caller has to
+        # get the Workshop ID from the user
+        return (mod_id_or_name, None)
@@ -2,6 +2,8 @@
 Utility functions for file operations
 """
 import os
+import stat
+import tempfile
 
 def read_file(file_path):
     """
@@ -13,19 +15,22 @@ def read_file(file_path):
     Returns:
         str: Contents of the file, or empty string if file doesn't exist
     """
-    if not os.path.exists(file_path):
-        return ""
-        
     try:
         with open(file_path, 'r', encoding='utf-8') as file:
             return file.read()
+    except FileNotFoundError:
+        # Let open() do the existence check instead of a separate stat
+        return ""
     except Exception as e:
         print(f"Error reading file {file_path}: {e}")
         return ""
 
 def write_file(file_path, content):
     """
-    Write content to a file
+    Write content to a file atomically
+    
+    The content is written to a temporary file in the same directory which
+    then replaces the target, so a crash mid-write never leaves a truncated file.
     
     Args:
         file_path (str): Path to the file to write
@@ -34,13 +39,40 @@ def write_file(file_path, content):
     Returns:
         bool: True if successful, False otherwise
     """
+    tmp_path = None
     try:
+        # Replace the file a symlink points to, not the link itself
+        file_path = os.path.realpath(file_path)
+        
         # Ensure directory exists
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        directory = os.path.dirname(file_path) or "."
+        os.makedirs(directory, exist_ok=True)
         
-        with open(file_path, 'w', encoding='utf-8') as file:
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=directory,
+                                         prefix=".tmp-", delete=False) as file:
+            tmp_path = file.name
             file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+            
+        # Keep the permissions and owner of the file being replaced (or the umask default)
+        try:
+            st = os.stat(file_path)
+            mode = stat.S_IMODE(st.st_mode)
+            try:
+                os.chown(tmp_path, st.st_uid, st.st_gid)
+            except PermissionError:
+                pass  # Not root: the new file can only belong to us anyway
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(tmp_path, mode)
+        
+        os.replace(tmp_path, file_path)
         return True
     except Exception as e:
         print(f"Error writing to file {file_path}: {e}")
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
         return False
\ No newline at end of file
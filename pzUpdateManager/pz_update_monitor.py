@@ -4,31 +4,126 @@ Project Zomboid Server Update Monitor
 Works with systemd service using RCON + proper log file reading
 """
 
-import json
 import time
+import random
 import subprocess
 import threading
-import requests
+import sched
+import signal
 import sqlite3
 import logging
 from logging.handlers import RotatingFileHandler
 import socket
 import struct
 import os
-import glob
-from datetime import datetime, timedelta
-from pathlib import Path
+import re
 import configparser
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+# orjson parses straight from bytes and is much faster; it is optional
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+# inotify lets the mod check wake up as soon as the server writes its log; optional
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:
+    INotify = None
+
+# Last known Steam build of the game
+SELECT_GAME_BUILD = "SELECT build_id FROM steam_versions WHERE type='game' AND app_id=?"
+# Store a build; cursor.rowcount tells whether a row was actually written.
+# (No UPSERT ... RETURNING: that needs SQLite 3.35, older than some distros ship.)
+INSERT_GAME_BUILD = """
+    INSERT OR IGNORE INTO steam_versions (type, app_id, build_id, last_checked)
+    VALUES ('game', ?, ?, datetime('now', 'localtime'))
+"""
+UPDATE_GAME_BUILD = """
+    UPDATE steam_versions SET build_id=?, last_checked=datetime('now', 'localtime')
+    WHERE type='game' AND app_id=? AND build_id != ?
+"""
+# Overwrites the stored build, used by the test-steam-update command
+SET_GAME_BUILD = "UPDATE steam_versions SET build_id=? WHERE type='game' AND app_id=?"
+
+# Validators from the last full response of a URL, for conditional GETs
+SELECT_HTTP_CACHE = "SELECT etag, last_modified FROM http_cache WHERE url=?"
+SAVE_HTTP_CACHE = "INSERT OR REPLACE INTO http_cache (url, etag, last_modified) VALUES (?, ?, ?)"
+
+# Mod check results in the server log: a CheckModsNeedUpdate status line
+# or a "Mod <name> Needs updating ..." line
+_MOD_CHECK_RE = re.compile(r'CheckModsNeedUpdate: (?P<status>Mods updated\.|Mods need update\.|Checking\.\.\.\.|)|Mod .*Needs updating')
+
+# Byte strings that mark those lines, for scanning raw log data before decoding
+_MOD_CHECK_TOKENS = (b'CheckModsNeedUpdate:', b'Needs updating')
+
+def _lines_containing(data, tokens):
+    """Decode only the lines of data (bytes) that contain one of tokens, in file order"""
+    spans = set()
+    for token in tokens:
+        pos = data.find(token)
+        while pos != -1:
+            start = data.rfind(b'\n', 0, pos) + 1
+            end = data.find(b'\n', pos)
+            if end == -1:
+                end = len(data)
+            spans.add((start, end))
+            pos = data.find(token, end)
+    return [data[start:end].decode('utf-8', errors='ignore').rstrip('\r') for start, end in sorted(spans)]
+
+# journalctl --grep pattern for the same lines, so the journal is filtered before it reaches us
+_JOURNAL_GREP = "CheckModsNeedUpdate:|Needs updating"
+
+# Player count in the reply to the RCON "players" command
+_PLAYER_COUNT_RE = re.compile(r'Players connected \((\d+)\)')
+
+# Server log lines served by the test-mod-* commands, as (ms after the first line, message)
+_FAKE_LOG_LINE = "[{ts}] LOG  : General     , {ms}> {message}"
+_FAKE_MODS_NEED_UPDATE = (
+    (0, "CheckModsNeedUpdate: Checking...."),
+    (1000, "CheckModsNeedUpdate: Mods need update."),
+    (2000, "Mod BetterSorting Needs updating from version 1.2 to 1.3"),
+)
+_FAKE_MODS_UP_TO_DATE = (
+    (0, "CheckModsNeedUpdate: Checking...."),
+    (2000, "CheckModsNeedUpdate: Mods updated."),
+)
+
+def _fake_log_lines(messages):
+    """Render (offset_ms, message) pairs as server log lines stamped with the current time"""
+    from datetime import datetime
+    now = datetime.now()
+    ts = now.strftime('%y-%m-%d %H:%M:%S.%f')[:-3]
+    base_ms = int(now.timestamp() * 1000)
+    return [_FAKE_LOG_LINE.format(ts=ts, ms=base_ms + offset, message=message) for offset, message in messages]
 
 class RCONClient:
     """Project Zomboid RCON client implementation"""
     
+    # Packet layout: int32 length, then int32 request id and int32 type
+    _HEADER = struct.Struct('<iii')
+    _LENGTH = struct.Struct('<i')
+    _ID_TYPE = struct.Struct('<ii')
+    
     def __init__(self, host, port, password):
         self.host = host
         self.port = port
         self.password = password
+        self._password_bytes = password.encode('utf-8')  # Re-sent on every reconnect
         self.socket = None
         self.request_id = 0
+        
+        # The monitor loop and the restart scheduler thread share this client
+        self._lock = threading.Lock()
+        
+        # Bytes received but not yet parsed, refilled in large reads
+        self._recv_buffer = bytearray()
+        self._recv_chunk = memoryview(bytearray(8192))
+        
+        # Reused for every outgoing packet, grown only for oversized commands
+        self._send_buffer = bytearray(4096)
     
     def connect(self):
         """Connect to RCON server"""
@@ -37,8 +132,13 @@ class RCONClient:
             self.socket.settimeout(10)
             self.socket.connect((self.host, self.port))
             
+            # Small request/reply packets: don't let Nagle hold them back. The
+            # connection is kept open between polls, so let TCP notice if it dies.
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            
             # Authenticate
-            self._send_packet(3, self.password)  # SERVERDATA_AUTH
+            self._send_packet(3, self._password_bytes)  # SERVERDATA_AUTH
             response = self._receive_packet()
             
             if response[0] == -1:  # Authentication failed
@@ -46,21 +146,33 @@ class RCONClient:
                 
             return True
         except Exception as e:
-            if self.socket:
-                self.socket.close()
-                self.socket = None
+            self.close()
             raise e
     
     def send_command(self, command):
-        """Send command and return response (handles multi-packet responses)"""
+        """Send command and return response (handles multi-packet responses)
+        
+        The authenticated socket is kept open between calls. If the server has
+        dropped it (e.g. after a restart), reconnect once and retry.
+        """
+        command_bytes = command.encode('utf-8')
+        with self._lock:
+            try:
+                return self._send_command(command_bytes)
+            except ConnectionError:
+                self.close()
+                return self._send_command(command_bytes)
+    
+    def _send_command(self, command_bytes):
+        """Send an encoded command over the current connection, connecting first if needed"""
         if not self.socket:
             self.connect()
         
         try:
-            self._send_packet(2, command)  # SERVERDATA_EXECCOMMAND
+            self._send_packet(2, command_bytes)  # SERVERDATA_EXECCOMMAND
             
-            # Handle multi-packet response
-            full_response = ""
+            # Handle multi-packet response, joined once at the end
+            parts = []
             packet_count = 0
             max_packets = 10
             
@@ -76,7 +188,7 @@ class RCONClient:
                     packet_count += 1
                     
                     if body:
-                        full_response += body
+                        parts.append(body)
                     
                     # If we get an empty packet, that usually signals the end
                     if len(body) == 0:
@@ -85,48 +197,65 @@ class RCONClient:
                 except socket.timeout:
                     # Timeout means no more packets coming
                     break
+                except ConnectionError:
+                    # A dead connection before any reply is worth a reconnect
+                    if packet_count == 0:
+                        raise
+                    break
                 except Exception:
                     # Any other error means we're done
                     break
             
             # Reset timeout
             self.socket.settimeout(10)
-            return full_response
+            return "".join(parts)
             
-        except Exception as e:
+        except (ConnectionError, socket.timeout):
+            # The stream is dead or out of sync - start over on the next command
             self.close()
-            raise e
+            raise
     
-    def _send_packet(self, packet_type, body):
-        """Send RCON packet"""
+    def _send_packet(self, packet_type, body_bytes):
+        """Send RCON packet with an already encoded body"""
         self.request_id += 1
-        body_bytes = body.encode('utf-8')
         
-        packet = struct.pack('<ii', self.request_id, packet_type) + body_bytes + b'\x00\x00'
-        length = len(packet)
+        # length, request id, type, body, two null terminators
+        total = 12 + len(body_bytes) + 2
+        if total > len(self._send_buffer):
+            self._send_buffer = bytearray(total)
         
-        self.socket.send(struct.pack('<i', length) + packet)
+        buffer = self._send_buffer
+        self._HEADER.pack_into(buffer, 0, total - 4, self.request_id, packet_type)
+        buffer[12:12 + len(body_bytes)] = body_bytes
+        buffer[total - 2:total] = b'\x00\x00'
+        
+        # sendall() retries short writes, unlike send()
+        self.socket.sendall(memoryview(buffer)[:total])
+    
+    def _fill_buffer(self, size):
+        """Receive until at least size bytes are buffered
+        
+        Reads up to 8KB per recv_into() call, so a small packet usually arrives
+        (length, header and body) in a single syscall.
+        """
+        while len(self._recv_buffer) < size:
+            received = self.socket.recv_into(self._recv_chunk)
+            if not received:
+                raise ConnectionError("Connection closed by RCON server")
+            self._recv_buffer += self._recv_chunk[:received]
     
     def _receive_packet(self):
         """Receive RCON packet"""
-        # Read packet length
-        length_data = self.socket.recv(4)
-        if len(length_data) < 4:
-            raise Exception("Failed to receive packet length")
-        
-        length = struct.unpack('<i', length_data)[0]
+        # Read packet length, then the packet itself
+        self._fill_buffer(4)
+        length = self._LENGTH.unpack_from(self._recv_buffer)[0]
+        self._fill_buffer(4 + length)
         
-        # Read packet data
-        data = b''
-        while len(data) < length:
-            chunk = self.socket.recv(length - len(data))
-            if not chunk:
-                raise Exception("Connection closed while receiving packet")
-            data += chunk
-        
-        # Parse packet
-        request_id, packet_type = struct.unpack('<ii', data[:8])
-        body = data[8:-2].decode('utf-8')  # Remove null terminators
+        # Parse packet straight from the receive buffer
+        request_id, packet_type = self._ID_TYPE.unpack_from(self._recv_buffer, 4)
+        with memoryview(self._recv_buffer)[12:length + 2] as body_view:  # Without null terminators
+            body = str(body_view, 'utf-8', 'replace')  # A bad byte in a player name mustn't kill the monitor
+        del self._recv_buffer[:4 + length]
         
         return request_id, packet_type, body
     
@@ -135,10 +264,12 @@ class RCONClient:
         if self.socket:
             self.socket.close()
             self.socket = None
+        self._recv_buffer.clear()
 
 class PZUpdateMonitor:
     def __init__(self, config_file="pz_monitor.conf"):
-        self.config = configparser.ConfigParser()
+        # Only needed while reading the settings below into plain attributes
+        config = configparser.ConfigParser()
         
         # Debug info
         print(f"Script location: {os.path.abspath(__file__)}")
@@ -152,26 +283,22 @@ class PZUpdateMonitor:
             f"/etc/{config_file}",  # System config directory
         ]
         
-        config_found = False
-        for config_path in config_paths:
-            if os.path.exists(config_path):
-                self.config.read(config_path)
-                config_found = True
-                print(f"Using config file: {os.path.abspath(config_path)}")
-                break
-        
-        if not config_found:
+        config_path = next((path for path in config_paths if os.path.exists(path)), None)
+        if config_path:
+            config.read(config_path)
+            print(f"Using config file: {os.path.abspath(config_path)}")
+        else:
             print(f"Warning: Config file '{config_file}' not found in any of these locations:")
             for path in config_paths:
                 exists = "✓" if os.path.exists(path) else "✗"
                 print(f"  {exists} {os.path.abspath(path)}")
             print("\nCreating default config file...")
             self.create_default_config(config_paths[1])  # Create in script directory
-            self.config.read(config_paths[1])
+            config.read(config_paths[1])
         
         # Configuration with proper error handling
         try:
-            self.steam_api_key = self.config.get('steam', 'api_key')
+            self.steam_api_key = config.get('steam', 'api_key')
             if self.steam_api_key == 'YOUR_STEAM_API_KEY_HERE':
                 print("Error: Please edit the config file and replace 'YOUR_STEAM_API_KEY_HERE' with your actual Steam API key.")
                 print("Get your API key from: https://steamcommunity.com/dev/apikey")
@@ -181,14 +308,14 @@ class PZUpdateMonitor:
             print("Get your API key from: https://steamcommunity.com/dev/apikey")
             exit(1)
             
-        self.app_id = self.config.get('steam', 'app_id', fallback='108600')  # PZ App ID
+        self.app_id = config.get('steam', 'app_id', fallback='108600')  # PZ App ID
         
-        self.server_host = self.config.get('server', 'host', fallback='localhost')
-        self.server_port = self.config.getint('server', 'port', fallback=16261)
-        self.rcon_port = self.config.getint('server', 'rcon_port', fallback=27015)
+        self.server_host = config.get('server', 'host', fallback='localhost')
+        self.server_port = config.getint('server', 'port', fallback=16261)
+        self.rcon_port = config.getint('server', 'rcon_port', fallback=27015)
         
         try:
-            self.rcon_password = self.config.get('server', 'rcon_password')
+            self.rcon_password = config.get('server', 'rcon_password')
             if self.rcon_password == 'your_rcon_password_here':
                 print("Error: Please edit the config file and set your RCON password.")
                 print("This should match the RCONPassword in your Project Zomboid server configuration.")
@@ -197,27 +324,73 @@ class PZUpdateMonitor:
             print("Error: RCON password not found in config. Please edit the config file and add your RCON password.")
             exit(1)
             
-        self.service_name = self.config.get('server', 'service_name', fallback='zomboid')
+        self.service_name = config.get('server', 'service_name', fallback='zomboid')
         
         # Log file paths for finding checkModsNeedUpdate results
-        self.log_paths = self.config.get('server', 'log_paths', fallback='').split(',') if self.config.get('server', 'log_paths', fallback='') else []
+        log_paths = config.get('server', 'log_paths', fallback='')
+        self.log_paths = log_paths.split(',') if log_paths else []
+        self._log_offsets = {}  # Log file path -> (inode, offset of the first byte not read yet)
+        self._log_files_cache = None  # (expiry time, result of find_server_log_files)
+        self._log_fds = {}  # Log file path -> (descriptor kept open between reads, its inode)
+        self._journal_grep = True  # Whether journalctl supports -g/--grep
+        self._journal_since = None  # Unix time the journal is read from until a cursor is known
+        self._journal_cursor = None  # Journal position after the last entry read
+        
+        self.check_interval = config.getint('monitor', 'check_interval', fallback=300)  # 5 minutes
+        self.steam_check_interval = config.getint('monitor', 'steam_check_interval', fallback=self.check_interval)
+        self.check_mods = config.getboolean('monitor', 'check_mods', fallback=True)  # Enabled by default
+        self.log_file = config.get('monitor', 'log_file', fallback='pz_monitor.log')
+        
+        # Consecutive failed Steam checks, and when the next one is due (time.monotonic())
+        self._fail_count = 0
+        self._next_steam_check = 0
         
-        self.check_interval = self.config.getint('monitor', 'check_interval', fallback=300)  # 5 minutes
-        self.check_mods = self.config.getboolean('monitor', 'check_mods', fallback=True)  # Enabled by default
+        # Set by stop() to end run_monitor_loop without waiting out its sleep
+        self._stop = threading.Event()
+        
+        # Stand-ins for RCON / the server logs, set by the test commands
+        self._player_count_override = None
+        self._fake_log_lines = None
         
         # Setup logging (both console and file)
         self.setup_logging()
         
         # Setup database for tracking Steam versions
         self.init_database()
+        self.game_build = None  # Last known Steam build, loaded on the first check
         
         # Setup RCON client
         self.rcon = RCONClient(self.server_host, self.rcon_port, self.rcon_password)
         
-        # Restart timer
-        self.restart_timer = None
+        # Shared HTTP session so Steam API polls reuse the same connection.
+        # Created on the first Steam check, so the test commands never import requests.
+        self.http = None
+        
+        # Runs the Steam check while the loop thread waits on the server's mod check
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pz-steam-check")
+        
+        # Restart scheduling: one scheduler thread runs all warning/restart events
+        self._scheduler_wakeup = threading.Event()
+        self.scheduler = sched.scheduler(time.monotonic, self._scheduler_delay)
+        self._scheduler_thread = None
+        self._restart_events = []
         self.restart_scheduled = False
     
+    def create_http_session(self):
+        """Create a keep-alive HTTP session with retries for the Steam APIs"""
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
+        session = requests.Session()
+        # Only api.steamcmd.net is polled, one request at a time
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1,
+                              max_retries=Retry(total=3, backoff_factor=0.5))
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({'User-Agent': 'pz-monitor/1'})
+        return session
+    
     def setup_logging(self):
         """Setup both console and file logging"""
         log_level = logging.DEBUG if os.getenv('PZ_DEBUG') else logging.INFO
@@ -239,9 +412,8 @@ class PZUpdateMonitor:
         self.logger.addHandler(console_handler)
         
         # File handler with rotation (10MB max, keep 5 files)
-        log_file = self.config.get('monitor', 'log_file', fallback='pz_monitor.log')
         file_handler = RotatingFileHandler(
-            log_file, 
+            self.log_file, 
             maxBytes=10*1024*1024,  # 10MB
             backupCount=5
         )
@@ -252,7 +424,7 @@ class PZUpdateMonitor:
         # Also setup root logger to prevent duplicate messages
         logging.getLogger().handlers.clear()
         
-        self.logger.info(f"Logging to console and file: {log_file}")
+        self.logger.info(f"Logging to console and file: {self.log_file}")
         
     def create_default_config(self, config_path):
         """Create a default configuration file"""
@@ -281,6 +453,9 @@ log_paths =
 # How often to check for updates (in seconds)
 check_interval = 300
 
+# Optional: poll Steam less often than the mods (in seconds, default: check_interval)
+# steam_check_interval = 900
+
 # Whether to check for mod updates
 check_mods = true
 
@@ -299,8 +474,18 @@ log_file = pz_monitor.log
         
     def init_database(self):
         """Initialize SQLite database to track Steam version history"""
-        self.db = sqlite3.connect('pz_steam_versions.db')
-        cursor = self.db.cursor()
+        # Autocommit mode: transactions are only opened explicitly by transaction().
+        # The connection may be used from the scheduler thread too, guarded by _db_lock.
+        self.db = sqlite3.connect('pz_steam_versions.db', isolation_level=None, check_same_thread=False)
+        self._db_lock = threading.Lock()
+        
+        # WAL + synchronous=NORMAL: commits no longer fsync the main database file
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("PRAGMA temp_store=MEMORY")
+        
+        # One cursor for every statement, only used while holding _db_lock
+        self._cursor = cursor = self.db.cursor()
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS steam_versions (
                 id INTEGER PRIMARY KEY,
@@ -311,10 +496,51 @@ log_file = pz_monitor.log
                 UNIQUE(type, app_id)
             )
         ''')
-        self.db.commit()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS http_cache (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT
+            )
+        ''')
+    
+    @contextmanager
+    def transaction(self):
+        """Run the enclosed statements as one write transaction on the shared cursor, committed on success"""
+        with self._db_lock:
+            self._cursor.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._cursor
+            except BaseException:
+                self._cursor.execute("ROLLBACK")
+                raise
+            self._cursor.execute("COMMIT")
+    
+    def close_database(self):
+        """Let SQLite refresh its query planner statistics, then close the database"""
+        try:
+            self.db.execute("PRAGMA optimize")
+            self.db.close()
+        except sqlite3.Error as e:
+            self.logger.debug(f"Could not close database cleanly: {e}")
     
     def find_server_log_files(self):
-        """Find Project Zomboid server log files"""
+        """Find Project Zomboid server log files, reusing the last result for check_interval seconds"""
+        now = time.monotonic()
+        if self._log_files_cache and now < self._log_files_cache[0]:
+            return self._log_files_cache[1]
+        
+        log_files = self._find_server_log_files()
+        self._log_files_cache = (now + self.check_interval, log_files)
+        
+        # Forget files that dropped out of the list (archived, or pushed out by a newer log)
+        for log_file in set(self._log_fds).union(self._log_offsets).difference(log_files):
+            self.close_log_file(log_file)
+            self._log_offsets.pop(log_file, None)
+        return log_files
+    
+    def _find_server_log_files(self):
+        """Search the configured and common locations for server log files"""
         log_files = []
         
         # Use configured paths if provided
@@ -339,14 +565,17 @@ log_file = pz_monitor.log
         ]
         
         for log_dir in common_locations:
-            if os.path.exists(log_dir) and os.path.isdir(log_dir):
+            if os.path.isdir(log_dir):
                 # Look for DebugLog-server.txt files (naming pattern: DD-MM-YY_HH-MM-SS_DebugLog-server.txt)
-                pattern = os.path.join(log_dir, "*DebugLog-server.txt")
-                matching_files = glob.glob(pattern)
+                # One directory scan, one stat per match for the sort
+                with os.scandir(log_dir) as it:
+                    entries = [(entry.stat().st_mtime, entry.path) for entry in it
+                               if entry.name.endswith("DebugLog-server.txt") and entry.is_file()]
                 
-                if matching_files:
+                if entries:
                     # Sort by modification time, newest first
-                    matching_files.sort(key=os.path.getmtime, reverse=True)
+                    entries.sort(reverse=True)
+                    matching_files = [path for _, path in entries]
                     log_files.extend(matching_files[:2])  # Take 2 most recent files
                     self.logger.debug(f"Found {len(matching_files)} log files in {log_dir}, using newest: {matching_files[:2]}")
                     break  # Stop at first directory with logs
@@ -354,40 +583,81 @@ log_file = pz_monitor.log
         return log_files
     
     def get_recent_log_content(self, hours=1):
-        """Get recent log content from server logs"""
+        """Get mod check related log lines written since the last call (initially the last 50KB of each log file)"""
+        if self._fake_log_lines is not None:
+            return self._fake_log_lines
+        
         recent_content = []
         
         # Method 1: Read from log files
         log_files = self.find_server_log_files()
         for log_file in log_files:
             try:
-                with open(log_file, 'r', encoding='utf-8', errors='ignore') as f:
-                    # For efficiency, read only the last part of the file
-                    f.seek(0, 2)  # Go to end
-                    file_size = f.tell()
-                    
-                    # Read last 50KB or whole file if smaller
-                    read_size = min(50000, file_size)
-                    f.seek(max(0, file_size - read_size))
-                    
-                    content = f.read()
-                    lines = content.split('\n')
-                    recent_content.extend(lines)
-                    
-                    self.logger.debug(f"Read {len(lines)} lines from {os.path.basename(log_file)}")
+                # One stat per file and read: its inode tells whether the open descriptor is still current
+                st = os.stat(log_file)
+                fd, fd_inode = self._log_fds.get(log_file, (None, None))
+                if st.st_ino != fd_inode:
+                    # Not open yet, or a new file now has this name: (re)open it
+                    self.close_log_file(log_file)
+                    fd = os.open(log_file, os.O_RDONLY)
+                    st = os.fstat(fd)
+                    self._log_fds[log_file] = (fd, st.st_ino)
+                
+                file_size = st.st_size
+                inode, offset = self._log_offsets.get(log_file, (None, None))
+                
+                if offset is None:
+                    # First look at this file: read last 50KB or whole file if smaller
+                    offset = max(0, file_size - 50000)
+                elif st.st_ino != inode or file_size < offset:
+                    # File was rotated or truncated, everything in it is new
+                    offset = 0
+                
+                data = os.pread(fd, file_size - offset, offset)
+                
+                # Leave a partly written last line for the next call
+                end = data.rfind(b'\n') + 1
+                self._log_offsets[log_file] = (st.st_ino, offset + end)
+                
+                # Find the interesting lines in the raw bytes, only those get decoded
+                lines = _lines_containing(data[:end], _MOD_CHECK_TOKENS)
+                recent_content.extend(lines)
+                
+                self.logger.debug(f"Read {end} bytes from {os.path.basename(log_file)}, {len(lines)} relevant lines")
                     
+            except FileNotFoundError:
+                # Log was moved away, e.g. archived on server restart - search again next time
+                self._log_files_cache = None
+                self._log_offsets.pop(log_file, None)
+                self.close_log_file(log_file)
             except Exception as e:
                 self.logger.debug(f"Could not read {log_file}: {e}")
         
-        # Method 2: Get from systemd journal as backup
-        if not recent_content:
+        # Method 2: Get from systemd journal as backup when there are no log files
+        if not log_files:
             try:
-                cutoff_time = (datetime.now() - timedelta(hours=hours)).strftime("%Y-%m-%d %H:%M:%S")
-                cmd = ['journalctl', '-u', self.service_name, '--since', cutoff_time, '--no-pager', '-q']
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+                # Continue after the last entry read, like the offsets kept for log files
+                cmd = ['journalctl', '-u', self.service_name, '--no-pager', '-q', '--show-cursor']
+                if self._journal_cursor:
+                    cmd += ['--after-cursor', self._journal_cursor]
+                else:
+                    since = self._journal_since or time.time() - hours * 3600
+                    cmd += ['--since', f"@{since:.6f}"]  # journalctl accepts @<unix time>
+                
+                # Let journalctl filter down to the lines the mod check looks at
+                if self._journal_grep:
+                    result = subprocess.run(cmd + ['-g', _JOURNAL_GREP], capture_output=True, text=True, timeout=10)
+                    if result.returncode != 0 and result.stderr.strip():
+                        # journalctl built without pattern matching support
+                        self.logger.debug(f"journalctl --grep unavailable: {result.stderr.strip()}")
+                        self._journal_grep = False
+                if not self._journal_grep:
+                    result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
                 
                 if result.returncode == 0 and result.stdout.strip():
-                    journal_lines = result.stdout.split('\n')
+                    journal_lines = result.stdout.splitlines()
+                    if journal_lines[-1].startswith('-- cursor: '):
+                        self._journal_cursor = journal_lines.pop()[len('-- cursor: '):]
                     recent_content.extend(journal_lines)
                     self.logger.debug(f"Got {len(journal_lines)} lines from systemd journal")
             except Exception as e:
@@ -395,126 +665,210 @@ log_file = pz_monitor.log
         
         return recent_content
     
+    def close_log_file(self, log_file=None):
+        """Close the descriptor kept open for log_file, or for all log files"""
+        for path in [log_file] if log_file else list(self._log_fds):
+            fd, _ = self._log_fds.pop(path, (None, None))
+            if fd is not None:
+                os.close(fd)
+    
+    def skip_to_log_end(self):
+        """Mark everything currently in the log files (or the journal) as read"""
+        self._journal_since = time.time()
+        self._journal_cursor = None
+        for log_file in self.find_server_log_files():
+            try:
+                st = os.stat(log_file)
+                self._log_offsets[log_file] = (st.st_ino, st.st_size)
+            except OSError as e:
+                self.logger.debug(f"Could not stat {log_file}: {e}")
+    
+    def watch_log_files(self):
+        """Return an INotify watching the log files for writes, or None to fall back to polling"""
+        log_files = self.find_server_log_files()
+        if INotify is None or not log_files:
+            return None
+        
+        inotify = INotify()
+        for log_file in log_files:
+            inotify.add_watch(log_file, inotify_flags.MODIFY)
+        return inotify
+    
+    def wait_for_log_update(self, watcher, timeout):
+        """Wait up to timeout seconds (at most 1s) for the server to write to its log"""
+        timeout = min(timeout, 1.0)
+        if watcher is None:
+            self._stop.wait(min(timeout, 0.5))
+        else:
+            watcher.read(timeout=int(timeout * 1000))
+    
+    def conditional_headers(self, url):
+        """If-None-Match / If-Modified-Since headers for the last full response of url"""
+        headers = {}
+        with self._db_lock:
+            cached = self._cursor.execute(SELECT_HTTP_CACHE, (url,)).fetchone()
+        if cached:
+            etag, last_modified = cached
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        return headers
+    
     def check_steam_game_update(self):
         """Check if there's a newer build available on Steam compared to what we last knew"""
         try:
             # Get current Steam build info
             url = f"https://api.steamcmd.net/v1/info/{self.app_id}"
-            response = requests.get(url, timeout=10)
+            if self.http is None:
+                self.http = self.create_http_session()
+            response = self.http.get(url, headers=self.conditional_headers(url), timeout=10)
             self.logger.info("Checking for game updates.")
             
-            if response.status_code == 200:
-                data = response.json()
-                steam_build = data['data'][self.app_id]['depots']['branches']['public']['buildid']
+            if response.status_code == 304:
+                # Nothing changed since the response we last processed
+                self._fail_count = 0
+                self.logger.info("Steam app info unchanged (304 Not Modified)")
+                return False
+            
+            if response.status_code != 200:
+                raise Exception(f"HTTP {response.status_code} from {url}")
+            
+            data = json_loads(response.content)
+            steam_build = data['data'][self.app_id]['depots']['branches']['public']['buildid']
+            
+            # Read and update the stored build in one transaction (one commit)
+            with self.transaction() as cursor:
+                cursor.execute(SAVE_HTTP_CACHE, (url, response.headers.get('ETag'), response.headers.get('Last-Modified')))
                 
-                cursor = self.db.cursor()
-                cursor.execute("SELECT build_id FROM steam_versions WHERE type='game' AND app_id=?", (self.app_id,))
-                result = cursor.fetchone()
+                # The previous build is only read from the database once per run
+                if self.game_build is None:
+                    result = cursor.execute(SELECT_GAME_BUILD, (self.app_id,)).fetchone()
+                    self.game_build = result[0] if result else None
                 
-                if result is None:
+                # One statement either way: insert the first build, or update only if it differs
+                if self.game_build is None:
+                    changed = cursor.execute(INSERT_GAME_BUILD, (self.app_id, steam_build)).rowcount
+                else:
+                    changed = cursor.execute(UPDATE_GAME_BUILD, (steam_build, self.app_id, steam_build)).rowcount
+                previous_build, self.game_build = self.game_build, steam_build
+                self._fail_count = 0
+                
+                if not changed:
+                    # Same build as before, no update
+                    self.logger.info(f"Steam build unchanged: {steam_build}")
+                    return False
+                elif previous_build is None:
                     # First run - initialize database with current build, don't trigger update
                     self.logger.info(f"First run: initializing database with current Steam build {steam_build}")
-                    cursor.execute("""
-                        INSERT OR REPLACE INTO steam_versions (type, app_id, build_id, last_checked)
-                        VALUES ('game', ?, ?, ?)
-                    """, (self.app_id, steam_build, datetime.now()))
-                    self.db.commit()
                     return False  # Don't trigger update on first run
-                elif result[0] != steam_build:
+                else:
                     # We have a previous build and it's different - this is a real update
-                    self.logger.info(f"Steam build changed from {result[0]} to {steam_build}")
-                    cursor.execute("""
-                        INSERT OR REPLACE INTO steam_versions (type, app_id, build_id, last_checked)
-                        VALUES ('game', ?, ?, ?)
-                    """, (self.app_id, steam_build, datetime.now()))
-                    self.db.commit()
+                    self.logger.info(f"Steam build changed from {previous_build} to {steam_build}")
                     return True
-                else:
-                    # Same build as before, no update
-                    self.logger.info(f"Steam build unchanged: {steam_build}")
-                    return False
-                    
+                
         except Exception as e:
             self.logger.error(f"Error checking Steam game updates: {e}")
+            self._next_steam_check = time.monotonic() + self.retry_delay()
         
         return False
     
-    def check_server_mods_need_update(self):
+    def check_server_mods_need_update(self, give_up=None):
         """Check if server mods need updates using RCON + log file reading.
             As per this: https://www.reddit.com/r/projectzomboid/comments/15277k7/checking_for_mod_updates_on_dedicated_server/
             checkModsNeedUpdates has two outputs:
             Mods need update:   There are mods that need to be updated
             Mods updated:	The mods are up to date
+            
+            give_up is an optional callable; once it returns True the check is
+            abandoned (returns False), e.g. because a restart is coming anyway.
         """
         try:
+            if give_up and give_up():
+                return False
+            
             self.logger.info("Checking for mod updates via RCON...")
             
+            # Only log lines written after the command are of interest
+            watcher = self.watch_log_files()
+            self.skip_to_log_end()
+            
             # Send the checkModsNeedUpdate command via RCON
             response = self.rcon.send_command("checkModsNeedUpdate")
             self.logger.debug(f"RCON command sent, response: {response}")
             
-            # The actual result is written to server logs, so wait and check logs
-            time.sleep(8)  # Give server more time to process and write to log
-            
-            # Get recent log content
-            recent_logs = self.get_recent_log_content(hours=1)
+            # The actual result is written to server logs: collect new log lines
+            # until the server reports a result or we give up
+            lines_read = 0
+            latest_response = None
+            latest_status = None
+            mod_update_lines = []
+            deadline = time.monotonic() + 13
+            try:
+                while True:
+                    new_lines = self.get_recent_log_content(hours=1)
+                    lines_read += len(new_lines)
+                    
+                    # One regex pass over the whole batch for both CheckModsNeedUpdate responses
+                    # and "Mod xxx Needs updating" lines, skipped when neither substring occurs
+                    blob = "\n".join(new_lines)
+                    line_end = -1
+                    if "CheckModsNeedUpdate: " in blob or "Needs updating" in blob:
+                        for match in _MOD_CHECK_RE.finditer(blob):
+                            if match.start() < line_end:
+                                continue  # Only the first match of a line counts
+                            line_start = blob.rfind("\n", 0, match.start()) + 1
+                            line_end = blob.find("\n", match.end())
+                            if line_end == -1:
+                                line_end = len(blob)
+                            line = blob[line_start:line_end].strip()
+                            
+                            if match.group('status') is not None:
+                                latest_response = line
+                                latest_status = match.group('status')
+                                self.logger.debug(f"Found CheckModsNeedUpdate line: {latest_response}")
+                            elif line not in mod_update_lines:
+                                mod_update_lines.append(line)
+                                self.logger.debug(f"Found mod update needed line: {line}")
+                    
+                    # "Checking...." means the server is still querying the workshop
+                    if latest_status is not None and latest_status != "Checking....":
+                        break
+                    
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or self._stop.is_set():
+                        break
+                    if give_up and give_up():
+                        self.logger.info("Abandoning mod check, a restart is already needed")
+                        return False
+                    self.wait_for_log_update(watcher, remaining)
+            finally:
+                if watcher is not None:
+                    watcher.close()
             
-            if not recent_logs:
-                self.logger.warning("No server logs found to check mod update status")
+            if not lines_read:
+                self.logger.warning("No mod check output found in server logs")
                 return False
             
             # Look for CheckModsNeedUpdate responses in the logs
-            self.logger.debug(f"Checking {len(recent_logs)} log lines for mod update status")
-            
-            # Find lines with CheckModsNeedUpdate responses
-            check_lines = []
-            for line in recent_logs:
-                if "CheckModsNeedUpdate:" in line:
-                    check_lines.append(line.strip())
-                    self.logger.debug(f"Found CheckModsNeedUpdate line: {line.strip()}")
+            self.logger.debug(f"Checked {lines_read} mod check log lines")
             
-            if not check_lines:
+            if not latest_response:
                 self.logger.warning("No CheckModsNeedUpdate responses found in logs")
                 return False
             
             # Parse the most recent CheckModsNeedUpdate response
-            latest_response = check_lines[-1]  # Get the most recent one
             self.logger.info(f"Latest mod check response: {latest_response}")
             
             # Check specific patterns in the actual PZ log format
-            if "CheckModsNeedUpdate: Mods updated." in latest_response:
+            if latest_status == "Mods updated.":
                 self.logger.info("Mods are up to date")
                 return False
-            elif "CheckModsNeedUpdate: Mods need update." in latest_response:
+            elif latest_status == "Mods need update.":
                 self.logger.info("Mods need updating.")
                 return True
-            elif "CheckModsNeedUpdate: Checking...." in latest_response:
-                # This means it's still checking, wait a bit more
-                self.logger.info("Server still checking mods, waiting longer...")
-                time.sleep(5)
-                
-                # Check again for completion
-                recent_logs = self.get_recent_log_content(hours=1)
-                check_lines = [line for line in recent_logs if "CheckModsNeedUpdate:" in line]
-                
-                if check_lines:
-                    latest_response = check_lines[-1]
-                    self.logger.info(f"Final mod check response: {latest_response}")
-                    
-                    if "CheckModsNeedUpdate: Mods updated." in latest_response:
-                        self.logger.info("Mods are up to date")
-                        return False
-                    elif "CheckModsNeedUpdate: Mods need update." in latest_response:
-                        self.logger.info("Mods need updating.")
-                        return True
             
             # Also check for specific "Mod xxx needs updating" messages
-            mod_update_lines = []
-            for line in recent_logs:
-                if "Needs updating" in line and "Mod " in line:
-                    mod_update_lines.append(line.strip())
-                    self.logger.debug(f"Found mod update needed line: {line.strip()}")
-            
             if mod_update_lines:
                 self.logger.info(f"Found {len(mod_update_lines)} mods that need updating:")
                 for line in mod_update_lines:
@@ -531,13 +885,14 @@ log_file = pz_monitor.log
     
     def get_player_count(self):
         """Get current number of connected players via RCON"""
+        if self._player_count_override is not None:
+            return self._player_count_override
+        
         try:
             response = self.rcon.send_command("players")
             
-            if response and "Players connected (" in response:
-                count_str = response.split("Players connected (")[1].split(")")[0]
-                return int(count_str)
-            return 0
+            match = _PLAYER_COUNT_RE.search(response) if response else None
+            return int(match.group(1)) if match else 0
         except Exception as e:
             self.logger.error(f"Error getting player count: {e}")
         
@@ -577,26 +932,57 @@ log_file = pz_monitor.log
         # Send initial warning
         self.send_server_message("🔄 SERVER UPDATE AVAILABLE! Server will restart in 30 minutes. Please finish your current activities.")
         
-        # Schedule 1-minute warning
-        def send_final_warning():
-            self.send_server_message("⚠️ SERVER RESTART IN 1 MINUTE! Please save your progress and find a safe location!")
-            
-        # Schedule restart
-        def do_restart():
-            self.send_server_message("🔧 Server restarting now for updates...")
-            time.sleep(5)  # Give players time to see the message
-            self.restart_server()
-        
-        # Set timers
-        warning_timer = threading.Timer(29 * 60, send_final_warning)  # 29 minutes
-        restart_timer = threading.Timer(30 * 60, do_restart)  # 30 minutes
-        
-        warning_timer.start()
-        restart_timer.start()
+        # Queue the 1-minute warning and the restart on the scheduler
+        self._restart_events = [
+            self.scheduler.enter(29 * 60, 1, self._send_final_warning),  # 29 minutes
+            self.scheduler.enter(30 * 60, 1, self._do_restart),  # 30 minutes
+        ]
+        self._start_scheduler()
         
-        self.restart_timer = restart_timer
         self.logger.info("Scheduled restart in 30 minutes with warnings")
     
+    def _send_final_warning(self):
+        """Scheduled 1 minute before the restart"""
+        self.send_server_message("⚠️ SERVER RESTART IN 1 MINUTE! Please save your progress and find a safe location!")
+    
+    def _do_restart(self):
+        """Scheduled restart at the end of the warning period"""
+        self.send_server_message("🔧 Server restarting now for updates...")
+        time.sleep(5)  # Give players time to see the message
+        try:
+            self.restart_server()
+        finally:
+            # Even if the restart failed, let the monitor loop resume polling
+            self._restart_events = []
+            self.restart_scheduled = False
+    
+    def _start_scheduler(self):
+        """Run queued scheduler events on a background thread, if one isn't already running"""
+        if self._scheduler_thread and self._scheduler_thread.is_alive():
+            return
+        
+        # Not a daemon: like the old threading.Timer pair, a pending restart
+        # keeps the process alive until it has run
+        self._scheduler_thread = threading.Thread(target=self.scheduler.run, name="pz-restart-scheduler")
+        self._scheduler_thread.start()
+    
+    def _scheduler_delay(self, timeout):
+        """Sleep for the scheduler, returning early when woken by cancel_restart"""
+        self._scheduler_wakeup.wait(timeout)
+        self._scheduler_wakeup.clear()
+    
+    def cancel_restart(self):
+        """Cancel a scheduled restart and its pending warning"""
+        for event in self._restart_events:
+            try:
+                self.scheduler.cancel(event)
+            except ValueError:
+                pass  # Already ran
+        self._restart_events = []
+        self.restart_scheduled = False
+        self._scheduler_wakeup.set()  # Let the scheduler thread notice the empty queue
+        self.logger.info("Scheduled restart cancelled")
+    
     def handle_update_detected(self):
         """Handle when an update is detected"""
         player_count = self.get_player_count()
@@ -645,6 +1031,14 @@ log_file = pz_monitor.log
             self.logger.error(f"Error details: {type(e).__name__}: {str(e)}")
             return False
     
+    def retry_delay(self):
+        """Capped exponential backoff with jitter for the next Steam check after a failed one"""
+        self._fail_count += 1
+        cap = max(self.steam_check_interval, 3600)  # Never wait longer than an hour, or one interval if that is longer
+        delay = min(self.steam_check_interval * 2 ** self._fail_count, cap) + random.uniform(0, 5)
+        self.logger.info(f"Retrying Steam check in {delay:.0f}s (failure #{self._fail_count})")
+        return delay
+    
     def run_monitor_loop(self):
         """Main monitoring loop"""
         self.logger.info("Starting Project Zomboid update monitor...")
@@ -654,15 +1048,35 @@ log_file = pz_monitor.log
             self.logger.error("Cannot connect to server. Please check RCON configuration.")
             return
         
+        # systemctl stop sends SIGTERM - wake the loop instead of dying mid-poll
+        signal.signal(signal.SIGTERM, lambda signum, frame: self.stop())
+        
+        # Steam has its own, possibly longer, interval; it is checked on the first tick it is due.
+        # A failed check pushes _next_steam_check further out (see retry_delay).
+        self._next_steam_check = time.monotonic()
+        
         while True:
             try:
-                # Check if Steam has a newer game version
-                game_updated = self.check_steam_game_update()
+                # A restart is already on its way - nothing to gain from polling until it happens
+                if self.restart_scheduled:
+                    if self._stop.wait(self.check_interval):
+                        break
+                    continue
                 
-                # Check if server mods need updates (if enabled)
+                # Check if Steam has a newer game version, in the background
+                steam_check = None
+                if time.monotonic() >= self._next_steam_check:
+                    self._next_steam_check = time.monotonic() + self.steam_check_interval
+                    steam_check = self._executor.submit(self.check_steam_game_update)
+                
+                # Meanwhile check if server mods need updates (if enabled)
                 mods_need_update = False
                 if self.check_mods:
-                    mods_need_update = self.check_server_mods_need_update()
+                    # No need to wait for the mod result once Steam reports a game update
+                    mods_need_update = self.check_server_mods_need_update(
+                        give_up=steam_check and (lambda: steam_check.done() and steam_check.result()))
+                
+                game_updated = steam_check.result() if steam_check else False
                 
                 if game_updated:
                     self.logger.info("Game update detected on Steam!")
@@ -671,17 +1085,29 @@ log_file = pz_monitor.log
                     self.logger.info("Mod updates needed!")
                     self.handle_update_detected()
                 
-                time.sleep(self.check_interval)
+                if self._stop.wait(self.check_interval):
+                    break
                 
             except KeyboardInterrupt:
                 self.logger.info("Monitor stopped by user")
                 break
             except Exception as e:
                 self.logger.error(f"Error in monitor loop: {e}")
-                time.sleep(60)  # Wait before retrying
+                if self._stop.wait(60):  # Wait before retrying
+                    break
         
         # Cleanup
+        if self.restart_scheduled:
+            self.cancel_restart()  # Don't leave a restart pending after the monitor stopped
+        self._executor.shutdown()
+        self.close_log_file()
         self.rcon.close()
+        self.close_database()
+    
+    def stop(self):
+        """Ask run_monitor_loop to exit, waking it from its sleep"""
+        self.logger.info("Stopping monitor...")
+        self._stop.set()
 
 if __name__ == "__main__":
     import sys
@@ -704,18 +1130,15 @@ if __name__ == "__main__":
             monitor = PZUpdateMonitor()
             
             # Force a fake steam update by setting an old build ID in database
-            cursor = monitor.db.cursor()
-            cursor.execute("SELECT build_id FROM steam_versions WHERE type='game' AND app_id=?", (monitor.app_id,))
-            result = cursor.fetchone()
+            fake_old_build = "12345678"
+            with monitor.transaction() as cursor:
+                result = cursor.execute(SELECT_GAME_BUILD, (monitor.app_id,)).fetchone()
+                if result:
+                    cursor.execute(SET_GAME_BUILD, (fake_old_build, monitor.app_id))
+                    cursor.execute("DELETE FROM http_cache")  # Force a full response instead of a 304
             
             if result:
                 old_build = result[0]
-                # Set database to a fake old build ID
-                fake_old_build = "12345678"
-                cursor.execute("""
-                    UPDATE steam_versions SET build_id=? WHERE type='game' AND app_id=?
-                """, (fake_old_build, monitor.app_id))
-                monitor.db.commit()
                 print(f"Set database to fake old build: {fake_old_build}")
                 
                 # Now run the check - it should detect the "update"
@@ -726,10 +1149,8 @@ if __name__ == "__main__":
                     print("❌ Failed to detect simulated steam update")
                     
                 # Restore original build ID
-                cursor.execute("""
-                    UPDATE steam_versions SET build_id=? WHERE type='game' AND app_id=?
-                """, (old_build, monitor.app_id))
-                monitor.db.commit()
+                with monitor.transaction() as cursor:
+                    cursor.execute(SET_GAME_BUILD, (old_build, monitor.app_id))
                 print(f"Restored original build ID: {old_build}")
             else:
                 print("No existing build ID found. Run the monitor once first to initialize.")
@@ -741,21 +1162,14 @@ if __name__ == "__main__":
             monitor = PZUpdateMonitor()
             
             # Create fake log content without touching real files
-            from datetime import datetime
-            timestamp = datetime.now().strftime("%y-%m-%d %H:%M:%S.%f")[:-3]
-            fake_log_lines = [
-                f"[{timestamp}] LOG  : General     , {int(datetime.now().timestamp() * 1000)}> CheckModsNeedUpdate: Checking....",
-                f"[{timestamp}] LOG  : General     , {int(datetime.now().timestamp() * 1000) + 1000}> CheckModsNeedUpdate: Mods need update.",
-                f"[{timestamp}] LOG  : General     , {int(datetime.now().timestamp() * 1000) + 2000}> Mod BetterSorting Needs updating from version 1.2 to 1.3"
-            ]
+            fake_log_lines = _fake_log_lines(_FAKE_MODS_NEED_UPDATE)
             
             print("Mocking log content with fake mod update messages:")
             for line in fake_log_lines:
                 print(f"  {line}")
             
-            # Mock the get_recent_log_content method to return our fake logs
-            original_get_recent_log_content = monitor.get_recent_log_content
-            monitor.get_recent_log_content = lambda hours=1: fake_log_lines
+            # Serve our fake logs instead of reading the log files
+            monitor._fake_log_lines = fake_log_lines
             
             try:
                 # Now test the mod checking with mocked log content
@@ -766,9 +1180,9 @@ if __name__ == "__main__":
                 else:
                     print("❌ Failed to detect simulated mod update")
             finally:
-                # Always restore the original method
-                monitor.get_recent_log_content = original_get_recent_log_content
-                print("✓ Log reading method restored")
+                # Always go back to the real log files
+                monitor._fake_log_lines = None
+                print("✓ Log reading restored")
             
             sys.exit(0)
             
@@ -777,14 +1191,13 @@ if __name__ == "__main__":
             monitor = PZUpdateMonitor()
             
             # Mock no players connected
-            original_get_player_count = monitor.get_player_count
-            monitor.get_player_count = lambda: 0
-            
-            print("Simulating update with 0 players connected...")
-            monitor.handle_update_detected()
+            monitor._player_count_override = 0
             
-            # Restore original method
-            monitor.get_player_count = original_get_player_count
+            try:
+                print("Simulating update with 0 players connected...")
+                monitor.handle_update_detected()
+            finally:
+                monitor._player_count_override = None
             sys.exit(0)
             
         elif command == "test-restart-scheduled":
@@ -792,17 +1205,16 @@ if __name__ == "__main__":
             monitor = PZUpdateMonitor()
             
             # Mock players connected
-            original_get_player_count = monitor.get_player_count
-            monitor.get_player_count = lambda: 3  # Simulate 3 players
-            
-            print("Simulating update with 3 players connected...")
-            monitor.handle_update_detected()
+            monitor._player_count_override = 3  # Simulate 3 players
             
-            print("Restart scheduled! Check server messages.")
-            print("The server will restart in 30 minutes with warnings.")
-            
-            # Restore original method
-            monitor.get_player_count = original_get_player_count
+            try:
+                print("Simulating update with 3 players connected...")
+                monitor.handle_update_detected()
+                
+                print("Restart scheduled! Check server messages.")
+                print("The server will restart in 30 minutes with warnings.")
+            finally:
+                monitor._player_count_override = None
             sys.exit(0)
             
         elif command == "test-mod-uptodate":
@@ -810,20 +1222,14 @@ if __name__ == "__main__":
             monitor = PZUpdateMonitor()
             
             # Create fake log content showing mods are up to date
-            from datetime import datetime
-            timestamp = datetime.now().strftime("%y-%m-%d %H:%M:%S.%f")[:-3]
-            fake_log_lines = [
-                f"[{timestamp}] LOG  : General     , {int(datetime.now().timestamp() * 1000)}> CheckModsNeedUpdate: Checking....",
-                f"[{timestamp}] LOG  : General     , {int(datetime.now().timestamp() * 1000) + 2000}> CheckModsNeedUpdate: Mods updated."
-            ]
+            fake_log_lines = _fake_log_lines(_FAKE_MODS_UP_TO_DATE)
             
             print("Mocking log content with up-to-date mod messages:")
             for line in fake_log_lines:
                 print(f"  {line}")
             
-            # Mock the get_recent_log_content method
-            original_get_recent_log_content = monitor.get_recent_log_content
-            monitor.get_recent_log_content = lambda hours=1: fake_log_lines
+            # Serve our fake logs instead of reading the log files
+            monitor._fake_log_lines = fake_log_lines
             
             try:
                 print("\nTesting mod update detection with mocked logs...")
@@ -832,8 +1238,8 @@ if __name__ == "__main__":
                 else:
                     print("✅ Correctly detected mods are up-to-date")
             finally:
-                monitor.get_recent_log_content = original_get_recent_log_content
-                print("✓ Log reading method restored")
+                monitor._fake_log_lines = None
+                print("✓ Log reading restored")
             
             sys.exit(0)
             print("Project Zomboid Update Monitor - Test Commands:")
@@ -3,9 +3,42 @@
 Minimal RCON test using the exact same code from working v17
 """
 
+import select
 import socket
 import struct
 
+# Packet header/length layouts, compiled once
+_HDR = struct.Struct('<ii')
+_LEN = struct.Struct('<i')
+
+# Let the kernel wait for the full count where supported
+_MSG_WAITALL = getattr(socket, 'MSG_WAITALL', 0)
+
+def build_packet(request_id, packet_type, body):
+    """Build a length-prefixed RCON packet in a single buffer"""
+    packet = bytearray(_LEN.size)
+    packet.extend(_HDR.pack(request_id, packet_type))
+    packet.extend(body)
+    packet.extend(b'\x00\x00')
+    _LEN.pack_into(packet, 0, len(packet) - _LEN.size)
+    return packet
+
+# Size of the receive buffer shared by every packet on a connection
+RECV_BUF_SIZE = 65536
+
+def recv_exact(sock, n, buf=None):
+    """Read exactly n bytes into buf (allocated if missing or too small), return a view of them"""
+    if buf is None or len(buf) < n:
+        buf = bytearray(n)
+    mv = memoryview(buf)[:n]
+    got = 0
+    while got < n:
+        r = sock.recv_into(mv[got:], 0, _MSG_WAITALL)
+        if not r:
+            raise ConnectionError("Connection closed by server")
+        got += r
+    return mv
+
 def test_rcon_v17_style(host, port, password):
     """Test RCON exactly like the working v17 version"""
     print(f"Testing RCON connection to {host}:{port}")
@@ -17,6 +50,9 @@ def test_rcon_v17_style(host, port, password):
         
         print("Connecting to socket...")
         sock.connect((host, port))
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECV_BUF_SIZE)
+        recv_buf = bytearray(RECV_BUF_SIZE)
         print("✓ Socket connected")
         
         # Send auth packet (EXACTLY like v17)
@@ -24,17 +60,14 @@ def test_rcon_v17_style(host, port, password):
         request_id = 1
         packet_type = 3  # SERVERDATA_AUTH
         body = password.encode('utf-8')
-        packet = struct.pack('<ii', request_id, packet_type) + body + b'\x00\x00'
-        length = len(packet)
-        sock.send(struct.pack('<i', length) + packet)
+        sock.send(build_packet(request_id, packet_type, body))
         print("✓ Auth packet sent")
         
         # Receive auth response
         print("Waiting for auth response...")
-        length_data = sock.recv(4)
-        length = struct.unpack('<i', length_data)[0]
-        data = sock.recv(length)
-        response_id, response_type = struct.unpack('<ii', data[:8])
+        length = _LEN.unpack(recv_exact(sock, 4, recv_buf))[0]
+        data = recv_exact(sock, length, recv_buf)
+        response_id, response_type = _HDR.unpack_from(data)
         print(f"Auth response: ID={response_id}, Type={response_type}")
         
         if response_id == -1:
@@ -44,14 +77,14 @@ def test_rcon_v17_style(host, port, password):
         
         print("✓ Authentication successful")
         
-        # Test with a simpler command first
+        # Test with a simpler command first (each command also uses the next ID for its sentinel)
         print("\n--- Testing simple 'players' command ---")
-        if test_command(sock, "players", 3):
+        if test_command(sock, "players", 3, recv_buf):
             print("✓ Players command working!")
         
         # Test with help command 
         print("\n--- Testing 'help' command ---")
-        if test_command(sock, "help", 4):
+        if test_command(sock, "help", 5, recv_buf):
             print("✓ Help command working!")
             sock.close()
             return True
@@ -66,46 +99,65 @@ def test_rcon_v17_style(host, port, password):
         sock.close()
         return False
 
-def test_command(sock, command, request_id):
+def test_command(sock, command, request_id, recv_buf=None):
     """Test a single command and handle multi-packet responses"""
+    if recv_buf is None:
+        recv_buf = bytearray(RECV_BUF_SIZE)
     try:
         # Send command
         print(f"Sending '{command}' command...")
         packet_type = 2  # SERVERDATA_EXECCOMMAND  
         body = command.encode('utf-8')
-        packet = struct.pack('<ii', request_id, packet_type) + body + b'\x00\x00'
-        length = len(packet)
-        sock.send(struct.pack('<i', length) + packet)
+        sock.sendall(build_packet(request_id, packet_type, body))
+        
+        # Follow it with an empty SERVERDATA_RESPONSE_VALUE. This assumes the server
+        # answers in order, so the echo of this sentinel marks the end of the
+        # command's response. PZ runs console commands on its main thread and may
+        # echo the sentinel first - then the loop below keeps waiting for the reply.
+        sentinel_id = request_id + 1
+        sock.sendall(build_packet(sentinel_id, 0, b''))
         print(f"✓ {command} command sent")
         
         # Receive response(s)
         print(f"Waiting for {command} response...")
-        full_response = ""
+        parts = []
         packet_count = 0
+        packets_seen = 0  # Including stray packets from earlier commands
         
-        while packet_count < 10:  # Limit to prevent infinite loop
+        while packets_seen < 10:  # Limit to prevent infinite loop if the sentinel never comes back
             try:
-                # Set short timeout to check for additional packets
-                if packet_count > 0:
-                    sock.settimeout(0.5)
-                else:
-                    sock.settimeout(10)  # First packet gets longer timeout
-                
-                length_data = sock.recv(4)
-                if len(length_data) < 4:
-                    print(f"Incomplete length data on packet {packet_count + 1}")
+                # Wait for the next packet - short wait for additional packets,
+                # the first packet gets longer. Nothing arriving means the end
+                # (for servers that never echo the sentinel).
+                wait = 0.5 if packet_count > 0 else 10
+                readable, _, _ = select.select([sock], [], [], wait)
+                if not readable:
+                    print(f"Timeout after packet {packet_count} - no more data")
                     break
-                    
-                length = struct.unpack('<i', length_data)[0]
-                data = sock.recv(length)
-                response_id, response_type = struct.unpack('<ii', data[:8])
-                body = data[8:-2].decode('utf-8')
+                
+                length = _LEN.unpack(recv_exact(sock, 4, recv_buf))[0]
+                data = recv_exact(sock, length, recv_buf)
+                response_id, response_type = _HDR.unpack_from(data)
+                body = data[8:-2].tobytes().decode('utf-8')
+                packets_seen += 1
+                
+                if response_id == sentinel_id:
+                    if packet_count:
+                        print("  (Sentinel echoed - end of response)")
+                        break
+                    # Answered out of order: the reply is still to come, and its end
+                    # can only be found by the timeout
+                    print("  (Sentinel echoed before the response - still waiting)")
+                    continue
+                if response_id != request_id:
+                    # Left over from an earlier command, e.g. its sentinel reply
+                    continue
                 
                 packet_count += 1
                 print(f"Packet {packet_count}: ID={response_id}, Type={response_type}, Length={len(body)}")
                 
                 if body:
-                    full_response += body
+                    parts.append(body)
                     print(f"  Body preview: {body[:100]}...")
                 else:
                     print(f"  Empty body")
@@ -121,15 +173,15 @@ def test_command(sock, command, request_id):
             except Exception as e:
                 print(f"Error reading packet {packet_count + 1}: {e}")
                 break
+        else:
+            print(f"Stopped after {packets_seen} packets without an end of response")
         
+        full_response = "".join(parts)
         print(f"\nTotal packets received: {packet_count}")
         print(f"Full response length: {len(full_response)}")
         if full_response:
             print(f"Full response preview: {full_response[:200]}...")
         
-        # Reset timeout
-        sock.settimeout(10)
-        
         # Check for expected content
         if command == "help" and "List of server commands" in full_response:
             return True